@@ -0,0 +1,28 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# distutils: extra_compile_args = -O3 -march=native -ffast-math -fno-finite-math-only
+# Optional compiled haversine kernel for geodetic_processor.py.
+# Build it in place (requires Cython and a C compiler): cythonize -i _haversine.pyx
+# -ffast-math lets GCC vectorize sin/cos through libmvec; -fno-finite-math-only
+# keeps NaN coordinates producing NaN distances.
+
+from cython cimport floating
+from libc.math cimport asin, cos, sin, sqrt
+
+cdef double EARTH_RADIUS_KM = 6371.0088 # Must match geodetic_processor.EARTH_RADIUS_KM
+
+def haversine_km(double ref_lat_rad, double ref_lon_rad,
+                 const floating[:] lats_rad, const floating[:] lons_rad, floating[:] out):
+    """
+    Writes the haversine distances in kilometers from the reference point to each
+    (lats_rad[i], lons_rad[i]) into out[i]. All angles are in radians; the arrays
+    must share one float type (float32 or float64).
+    """
+    cdef Py_ssize_t i, n = lats_rad.shape[0]
+    cdef double cos_ref_lat = cos(ref_lat_rad)
+    cdef double sin_dlat, sin_dlon, a
+    with nogil:
+        for i in range(n):
+            sin_dlat = sin((lats_rad[i] - ref_lat_rad) * 0.5)
+            sin_dlon = sin((lons_rad[i] - ref_lon_rad) * 0.5)
+            a = sin_dlat * sin_dlat + cos_ref_lat * cos(lats_rad[i]) * sin_dlon * sin_dlon
+            out[i] = 2.0 * EARTH_RADIUS_KM * asin(sqrt(a))
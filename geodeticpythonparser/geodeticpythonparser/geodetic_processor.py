@@ -1,13 +1,24 @@
 # This script processes geodetic data: loads points from a CSV file,
 # filters them based on proximity to a central camp location,
 # and generates an HTML map visualizing these points.
-# It can dynamically install required packages (pandas, geopy, folium),
+# When run directly it can install missing required packages (pandas, numpy, folium),
 # but it is recommended to install them beforehand using the provided
 # `requirements.txt` file: pip install -r requirements.txt
 
+import concurrent.futures
+import csv
+import hashlib
+import html
+import importlib
+import importlib.util
+import io
+import json
+import math
 import os
 import subprocess
 import sys
+from collections import OrderedDict, deque
+from pathlib import Path
 
 # Function to install missing modules
 def install_and_import(package):
@@ -15,29 +26,74 @@ def install_and_import(package):
     Imports a package if available, or installs it using pip and then imports it.
     Note: It's generally recommended to manage dependencies via `requirements.txt`.
     This function is a fallback for environments where packages might be missing.
+
+    Returns:
+        module: The imported package.
     """
-    try:
-        __import__(package)
-    except ImportError:
+    # find_spec only looks the package up, so the common case never raises or imports twice
+    if importlib.util.find_spec(package) is None:
         print(f"{package} is not installed. Installing now...")
         # It's good practice to use sys.executable to ensure pip is called with the correct Python interpreter.
         subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-    finally:
-        globals()[package] = __import__(package)
+        importlib.invalidate_caches()
+    return importlib.import_module(package)
 
-# Ensure required libraries are installed (fallback if not using requirements.txt)
+# Ensure required libraries are installed when run as a script (fallback if not using
+# requirements.txt). Importing this module never runs pip.
 # For a more standard approach, run: pip install -r requirements.txt
-install_and_import("pandas")
-install_and_import("geopy")
-install_and_import("folium")
+if __name__ == "__main__":
+    for required_package in ("pandas", "numpy", "folium"):
+        install_and_import(required_package)
 
+import numpy as np
 import pandas as pd
-from geopy.distance import geodesic
-import folium
+
+# Numba is optional: when available the haversine distances are computed by a
+# compiled, multi-threaded kernel instead of a chain of NumPy array operations.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Optional C extension built from _haversine.pyx (cythonize -i _haversine.pyx).
+# It replaces the NumPy kernels when Numba is not installed.
+try:
+    import _haversine as _haversine_ext
+except ImportError:
+    _haversine_ext = None
 
 # Define the location of the student camp (Konakovo, Tverskaya Oblast', Russian Federation)
 CAMP_LOCATION = (56.7119, 36.7614) # Latitude, Longitude
+# The camp as a (latitude, longitude) array in radians, the form the distance kernels take.
+# CAMP_LOCATION stays the public tuple in degrees.
+CAMP_LATLON_RAD = np.radians(np.array(CAMP_LOCATION, dtype=np.float64))
 MAX_DISTANCE_KM = 5 # Default maximum distance in kilometers for filtering points
+EARTH_RADIUS_KM = 6371.0088 # Mean Earth radius (IUGG) used by the haversine formula
+PROXIMITY_INDEX_MIN_POINTS = 1000 # Below this many points a linear scan beats building a spatial tree
+CSV_COLUMNS = ['latitude', 'longitude', 'description'] # Columns read from the input CSV; any others are not parsed
+FILTERED_CSV_COLUMNS = CSV_COLUMNS + ['distance_km'] # Column order of the filtered output CSV
+FILTERED_CSV_FLOAT_FORMAT = '%.6f' # 6 decimals place a coordinate to ~0.1 m and a distance to 1 mm
+FILTERED_CSV_BUFFER_SIZE = 1 << 20 # Bytes buffered per write to the filtered output CSV
+# Coordinates are parsed as float32: ~7 significant digits resolve a latitude/longitude
+# to well under a meter, and half-width arrays halve the memory traffic of the filter.
+COORDINATE_DTYPES = {'latitude': 'float32', 'longitude': 'float32'}
+CHUNK_SIZE = 200_000 # Rows parsed at a time when streaming the input CSV
+CHUNK_BYTES = 64 << 20 # Bytes of CSV handed to a worker process at a time by filter_file
+FAST_MARKER_CLUSTER_MIN_POINTS = 200 # From this many points the map draws markers with FastMarkerCluster
+MAP_CACHE_SIZE = 32 # Number of rendered maps kept for create_map(..., cache_key=...)
+
+# Leaflet function building a green leaf marker from a [latitude, longitude, popup, tooltip]
+# row. Used as the FastMarkerCluster callback and for the markers injected by create_map.
+POINT_MARKER_CALLBACK = """function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: 'leaf', markerColor: 'green', prefix: 'glyphicon', iconColor: 'white'});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(row[2]);
+    marker.bindTooltip(row[3]);
+    return marker;
+}"""
+
+# pyarrow is optional: when installed, CSV files are parsed by its multithreaded reader
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
 
 def create_sample_file(file_path):
     """
@@ -56,11 +112,73 @@ def create_sample_file(file_path):
     df.to_csv(file_path, index=False)
     print(f"Sample geodetic data file created at {file_path}")
 
+def _csv_usecols(file_path):
+    """
+    Reads only the header line of a CSV file and returns the columns from
+    CSV_COLUMNS that it contains, in file order.
+
+    Raises:
+        pandas.errors.EmptyDataError: If the file has no header line.
+    """
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f), [])
+    if not header:
+        raise pd.errors.EmptyDataError(f"No columns to parse from file {file_path}")
+    return [col for col in header if col in CSV_COLUMNS]
+
+def _read_csv(file_path):
+    """
+    Reads the columns listed in CSV_COLUMNS from a CSV file.
+    With pyarrow installed the file is memory-mapped and parsed directly by the
+    multithreaded PyArrow CSV reader into Arrow-backed columns; otherwise the
+    pandas C engine is used. Either way the coordinates are declared as
+    COORDINATE_DTYPES up front so the parser can skip type inference.
+
+    Args:
+        file_path (str): The path to the CSV file.
+
+    Returns:
+        pandas.DataFrame: The parsed data.
+
+    Raises:
+        pandas.errors.EmptyDataError: If the file has no header line.
+    """
+    usecols = _csv_usecols(file_path)
+    if _HAS_PYARROW:
+        import pyarrow as pa
+        # The memory map lets the reader work on the OS page cache instead of a copy of the file
+        with pa.memory_map(file_path) as source:
+            return _pyarrow_read_csv(source, usecols)
+    return pd.read_csv(file_path, engine='c', usecols=usecols, dtype=COORDINATE_DTYPES)
+
+def _pyarrow_read_csv(source, usecols):
+    """
+    Parses CSV from an open PyArrow input stream with the multithreaded PyArrow
+    CSV reader, declaring the coordinates as COORDINATE_DTYPES.
+
+    Args:
+        source (pyarrow.NativeFile): The CSV input, header line first.
+        usecols (list): The columns to parse.
+
+    Returns:
+        pandas.DataFrame: The parsed data, with Arrow-backed columns.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    column_types = {col: pa.from_numpy_dtype(np.dtype(dtype)) for col, dtype in COORDINATE_DTYPES.items()}
+    table = pacsv.read_csv(
+        source,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        convert_options=pacsv.ConvertOptions(column_types=column_types, include_columns=usecols))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
 def load_geodetic_data(file_path):
     """
     Loads geodetic data from a specified CSV file.
     The CSV file must contain 'latitude' and 'longitude' columns.
     If the file doesn't exist, it attempts to create a sample file.
+    Coordinates are converted to numbers once here; rows whose coordinates
+    are missing or invalid are dropped, so later steps can rely on numeric columns.
 
     Args:
         file_path (str): The path to the CSV file.
@@ -73,11 +191,16 @@ def load_geodetic_data(file_path):
         print(f"File {file_path} not found. Creating a sample file...")
         create_sample_file(file_path)
     try:
-        data = pd.read_csv(file_path)
+        data = _read_csv(file_path)
         if not {'latitude', 'longitude'}.issubset(data.columns):
             # Ensure critical columns are present before further processing
             raise ValueError("The file must contain 'latitude' and 'longitude' columns.")
-        return data
+        data['latitude'] = pd.to_numeric(data['latitude'], errors='coerce')
+        data['longitude'] = pd.to_numeric(data['longitude'], errors='coerce')
+        valid_data = data.dropna(subset=['latitude', 'longitude'])
+        if len(valid_data) < len(data):
+            print(f"Warning: Dropped {len(data) - len(valid_data)} row(s) with missing or invalid coordinates.")
+        return valid_data
     except FileNotFoundError:
         print(f"Error: The file {file_path} was not found even after attempting to create a sample.")
         return None
@@ -91,6 +214,185 @@ def load_geodetic_data(file_path):
         print(f"An unexpected error occurred while loading file {file_path}: {e}")
         return None
 
+def _haversine_km_numpy(lat1_rad, lon1_rad, lats_rad, lons_rad):
+    """Vectorized NumPy haversine; all angles in radians, result in kilometers."""
+    dlat = lats_rad - lat1_rad
+    dlon = lons_rad - lon1_rad
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lats_rad) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+# fastmath without the 'nnan'/'ninf' flags: invalid coordinates arrive as NaN
+# and must still produce a NaN distance rather than undefined results.
+_NUMBA_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+if njit is not None:
+    @njit(parallel=True, fastmath=_NUMBA_FASTMATH, cache=True)
+    def _haversine_km_numba(lat1_rad, lon1_rad, lats_rad, lons_rad, out):
+        """Fused haversine loop writing kilometers into `out`; all angles in radians."""
+        cos_lat1 = math.cos(lat1_rad)
+        for i in prange(lats_rad.shape[0]):
+            sin_dlat = math.sin((lats_rad[i] - lat1_rad) * 0.5)
+            sin_dlon = math.sin((lons_rad[i] - lon1_rad) * 0.5)
+            a = sin_dlat * sin_dlat + cos_lat1 * math.cos(lats_rad[i]) * sin_dlon * sin_dlon
+            out[i] = 2.0 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+else:
+    _haversine_km_numba = None
+
+def _make_haversine_from_reference_km(ref_lat, ref_lon):
+    """
+    Builds a haversine function specialized for one fixed reference point.
+    The reference radians, cos(ref_lat) and the 2R factor are computed once here
+    and captured as constants, so under Numba LLVM folds them into the loop.
+    Constants are captured per float type, keeping float32 inputs in float32.
+
+    Args:
+        ref_lat (float): Latitude of the reference point in degrees.
+        ref_lon (float): Longitude of the reference point in degrees.
+
+    Returns:
+        callable: f(lats_rad, lons_rad) -> numpy.ndarray of distances in kilometers.
+    """
+    kernels = {}
+
+    def kernel_for(float_type):
+        ref_lat_rad = float_type(math.radians(ref_lat))
+        ref_lon_rad = float_type(math.radians(ref_lon))
+        cos_ref_lat = float_type(math.cos(math.radians(ref_lat)))
+        half = float_type(0.5)
+        two_r = float_type(2 * EARTH_RADIUS_KM)
+
+        if njit is None:
+            def kernel(lats_rad, lons_rad):
+                a = np.sin((lats_rad - ref_lat_rad) * half) ** 2 + \
+                    cos_ref_lat * np.cos(lats_rad) * np.sin((lons_rad - ref_lon_rad) * half) ** 2
+                return two_r * np.arcsin(np.sqrt(a))
+            return kernel
+
+        @njit(parallel=True, fastmath=_NUMBA_FASTMATH)
+        def fill(lats_rad, lons_rad, out):
+            for i in prange(lats_rad.shape[0]):
+                sin_dlat = math.sin((lats_rad[i] - ref_lat_rad) * half)
+                sin_dlon = math.sin((lons_rad[i] - ref_lon_rad) * half)
+                a = sin_dlat * sin_dlat + cos_ref_lat * math.cos(lats_rad[i]) * sin_dlon * sin_dlon
+                out[i] = two_r * math.asin(math.sqrt(a))
+
+        def kernel(lats_rad, lons_rad):
+            out = np.empty_like(lats_rad)
+            fill(lats_rad, lons_rad, out)
+            return out
+        return kernel
+
+    def haversine_from_reference_km(lats_rad, lons_rad):
+        float_type = lats_rad.dtype.type
+        if float_type not in kernels:
+            kernels[float_type] = kernel_for(float_type)
+        return kernels[float_type](lats_rad, lons_rad)
+
+    return haversine_from_reference_km
+
+# Distance kernel specialized for the camp, the reference point of every main() run
+_haversine_from_camp_km = _make_haversine_from_reference_km(*CAMP_LOCATION)
+
+def _haversine_km(ref_lat_rad, ref_lon_rad, lats_rad, lons_rad):
+    """
+    Computes great-circle distances from a reference point to arrays of points
+    using the haversine formula. Uses the Numba kernels when Numba is installed
+    (with distances from the camp using the kernel specialized for CAMP_LOCATION),
+    else the compiled _haversine extension if it was built, else the vectorized
+    NumPy implementation. The result has the floating-point type of `lats_rad`
+    (float32 or float64).
+
+    Coordinates are passed as separate latitude and longitude arrays (structure
+    of arrays) already converted to radians, see _reference_radians.
+
+    Args:
+        ref_lat_rad (float): Latitude of the reference point in radians.
+        ref_lon_rad (float): Longitude of the reference point in radians.
+        lats_rad (numpy.ndarray): Latitudes of the points in radians.
+        lons_rad (numpy.ndarray): Longitudes of the points in radians.
+
+    Returns:
+        numpy.ndarray: Distances in kilometers (NaN where a coordinate is NaN).
+    """
+    if njit is None and _haversine_ext is not None:
+        out = np.empty_like(lats_rad)
+        _haversine_ext.haversine_km(ref_lat_rad, ref_lon_rad, lats_rad, lons_rad, out)
+        return out
+    if ref_lat_rad == CAMP_LATLON_RAD[0] and ref_lon_rad == CAMP_LATLON_RAD[1]:
+        return _haversine_from_camp_km(lats_rad, lons_rad)
+    # Match the reference to the array type so float32 inputs are not promoted
+    float_type = lats_rad.dtype.type
+    ref_lat_rad, ref_lon_rad = float_type(ref_lat_rad), float_type(ref_lon_rad)
+    if _haversine_km_numba is not None:
+        out = np.empty_like(lats_rad)
+        _haversine_km_numba(ref_lat_rad, ref_lon_rad, lats_rad, lons_rad, out)
+        return out
+    return _haversine_km_numpy(ref_lat_rad, ref_lon_rad, lats_rad, lons_rad)
+
+def _reference_radians(reference_point):
+    """Returns a (latitude, longitude) point in degrees as (lat_rad, lon_rad) floats."""
+    if tuple(reference_point) == CAMP_LOCATION:
+        return float(CAMP_LATLON_RAD[0]), float(CAMP_LATLON_RAD[1])
+    return math.radians(reference_point[0]), math.radians(reference_point[1])
+
+def _bounding_box_mask(ref_lat_rad, ref_lon_rad, lats_rad, lons_rad, max_distance_km):
+    """
+    Cheap, trigonometry-free prefilter for proximity queries. Marks the points
+    inside a latitude/longitude box that contains every point within
+    `max_distance_km` of the reference, so only those points need the exact
+    haversine distance. The box never excludes a point inside the radius.
+
+    Args:
+        ref_lat_rad (float): Latitude of the reference point in radians.
+        ref_lon_rad (float): Longitude of the reference point in radians.
+        lats_rad (numpy.ndarray): Latitudes of the points in radians.
+        lons_rad (numpy.ndarray): Longitudes of the points in radians.
+        max_distance_km (float): The search radius in kilometers.
+
+    Returns:
+        numpy.ndarray: Boolean mask, False for points outside the box or with NaN coordinates.
+    """
+    angle = max_distance_km / EARTH_RADIUS_KM # Search radius in radians
+    # Widen the box slightly (~13 m) so float32 rounding cannot cut off points right at the edge
+    slack = 2e-6
+    dlat_max = angle + slack
+    mask = np.abs(lats_rad - lats_rad.dtype.type(ref_lat_rad)) <= dlat_max
+
+    # If the circle reaches a pole, it spans every longitude
+    if abs(ref_lat_rad) + dlat_max < math.pi / 2:
+        # The circle is widest in longitude where it touches a meridian:
+        # sin(dlon_max) = sin(angle) / cos(ref_lat)
+        dlon_max = math.asin(min(1.0, math.sin(angle) / math.cos(ref_lat_rad))) + slack
+        dlon = np.abs(lons_rad - lons_rad.dtype.type(ref_lon_rad)) % (2 * math.pi)
+        mask &= np.minimum(dlon, 2 * math.pi - dlon) <= dlon_max # Measure across the antimeridian too
+    return mask
+
+def _coordinate_arrays(data):
+    """
+    Extracts the 'latitude' and 'longitude' columns as float arrays.
+    Invalid values become NaN instead of raising, and a single warning
+    reports how many rows will be skipped because of them. Columns that are
+    both float32 (as parsed by load_geodetic_data, NumPy or Arrow-backed) stay float32.
+
+    Args:
+        data (pandas.DataFrame): DataFrame with 'latitude' and 'longitude' columns.
+
+    Returns:
+        tuple: (lats, lons) as numpy.ndarray of float32 or float64.
+    """
+    lats = pd.to_numeric(data['latitude'], errors='coerce')
+    lons = pd.to_numeric(data['longitude'], errors='coerce')
+    # Arrow-backed columns report their NumPy equivalent through numpy_dtype
+    is_float32 = [getattr(col.dtype, 'numpy_dtype', col.dtype) == np.float32 for col in (lats, lons)]
+    float_type = np.float32 if all(is_float32) else np.float64
+    lats = lats.to_numpy(dtype=float_type, na_value=np.nan)
+    lons = lons.to_numpy(dtype=float_type, na_value=np.nan)
+
+    invalid_count = int(np.count_nonzero(np.isnan(lats) | np.isnan(lons)))
+    if invalid_count:
+        print(f"Warning: Could not calculate distance for {invalid_count} row(s) with invalid coordinates. Skipping.")
+    return lats, lons
+
 def filter_by_proximity(data, reference_point, max_distance_km=MAX_DISTANCE_KM):
     """
     Filters geodetic data points to include only those within a specified
@@ -115,26 +417,353 @@ def filter_by_proximity(data, reference_point, max_distance_km=MAX_DISTANCE_KM):
         print("Error: Data must contain 'latitude' and 'longitude' columns for proximity filtering.")
         return pd.DataFrame()
 
-    def calculate_distance(row):
-        """Calculates distance using geodesic formula, handles potential errors."""
+    lats, lons = _coordinate_arrays(data)
+    lats_rad, lons_rad = np.radians(lats), np.radians(lons)
+    ref_lat_rad, ref_lon_rad = _reference_radians(reference_point)
+
+    # Only points inside the bounding box need an exact distance; the rest
+    # (including NaN coordinates) keep an infinite distance
+    in_box = _bounding_box_mask(ref_lat_rad, ref_lon_rad, lats_rad, lons_rad, max_distance_km)
+    d_km = np.full(len(lats_rad), np.inf, dtype=lats_rad.dtype)
+    d_km[in_box] = _haversine_km(ref_lat_rad, ref_lon_rad, lats_rad[in_box], lons_rad[in_box])
+
+    # Filter with a boolean mask. Only the two coordinate arrays were read above;
+    # the other columns (e.g. description strings) are sliced once, by position,
+    # into a new frame, so the input is never modified.
+    mask = d_km <= max_distance_km
+    return data.iloc[np.flatnonzero(mask)].assign(distance_km=d_km[mask])
+
+def _input_usecols(file_path):
+    """
+    Returns the CSV_COLUMNS present in an input file, creating a sample file
+    first if the file doesn't exist.
+
+    Raises:
+        pandas.errors.EmptyDataError: If the file is empty.
+        ValueError: If the file does not contain 'latitude' and 'longitude' columns.
+    """
+    if not os.path.exists(file_path):
+        print(f"File {file_path} not found. Creating a sample file...")
+        create_sample_file(file_path)
+
+    usecols = _csv_usecols(file_path)
+    if not {'latitude', 'longitude'}.issubset(usecols):
+        raise ValueError("The file must contain 'latitude' and 'longitude' columns.")
+    return usecols
+
+def stream_and_filter(file_path, reference_point, max_distance_km=MAX_DISTANCE_KM, chunksize=CHUNK_SIZE):
+    """
+    Reads a geodetic CSV file in chunks and yields the points of each chunk that
+    lie within `max_distance_km` of `reference_point`. Only one chunk is held in
+    memory at a time, so files larger than the available RAM can be processed.
+    If the file doesn't exist, a sample file is created first.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        reference_point (tuple): A tuple (latitude, longitude) for the reference location.
+        max_distance_km (float): The maximum distance in kilometers for points to be included.
+        chunksize (int): The number of rows parsed per chunk.
+
+    Yields:
+        pandas.DataFrame: The filtered points of one non-empty chunk, with an
+                          additional 'distance_km' column (possibly no rows).
+
+    Raises:
+        pandas.errors.EmptyDataError: If the file is empty.
+        ValueError: If the file does not contain 'latitude' and 'longitude' columns.
+    """
+    usecols = _input_usecols(file_path)
+
+    # The distance filter is independent per row, so each chunk is filtered on its own
+    with pd.read_csv(file_path, chunksize=chunksize, usecols=usecols, dtype=COORDINATE_DTYPES) as reader:
+        for chunk in reader:
+            if not chunk.empty:
+                yield filter_by_proximity(chunk, reference_point, max_distance_km)
+
+def _iter_chunk_bytes(file_path, chunksize_bytes=CHUNK_BYTES):
+    """
+    Splits a CSV file into self-contained pieces of roughly `chunksize_bytes`:
+    each piece is the header line followed by whole data lines, so it can be
+    parsed on its own. Fields with embedded newlines are not supported.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        chunksize_bytes (int): The approximate number of data bytes per piece.
+
+    Yields:
+        bytes: The header line followed by a run of complete data lines.
+    """
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        if header and not header.endswith(b'\n'):
+            header += b'\n' # A header-only file without a trailing newline
+        while True:
+            block = f.read(chunksize_bytes)
+            if not block:
+                break
+            # Extend the block to the end of the line it stops in
+            if not block.endswith(b'\n'):
+                block += f.readline()
+            yield header + block
+
+def _filter_chunk(chunk_bytes, reference_point, max_distance_km, usecols):
+    """
+    Parses one piece from _iter_chunk_bytes and filters it by proximity. This is
+    the work done by filter_file's worker processes, so it is a module-level
+    function that can be pickled.
+
+    Args:
+        chunk_bytes (bytes): CSV data, header line first.
+        reference_point (tuple): A tuple (latitude, longitude) for the reference location.
+        max_distance_km (float): The maximum distance in kilometers for points to be included.
+        usecols (list): The columns to parse.
+
+    Returns:
+        tuple: The filtered points as a pandas.DataFrame with a 'distance_km'
+               column, and the number of rows parsed from the piece.
+    """
+    if _HAS_PYARROW:
+        import pyarrow as pa
+        chunk = _pyarrow_read_csv(pa.BufferReader(chunk_bytes), usecols)
+    else:
+        chunk = pd.read_csv(io.BytesIO(chunk_bytes), engine='c', usecols=usecols, dtype=COORDINATE_DTYPES)
+    if chunk.empty:
+        return chunk, 0
+    return filter_by_proximity(chunk, reference_point, max_distance_km), len(chunk)
+
+def filter_file(file_path, reference_point, max_distance_km=MAX_DISTANCE_KM, max_workers=None,
+                chunksize_bytes=CHUNK_BYTES):
+    """
+    Like stream_and_filter, but the file is split into pieces of about
+    `chunksize_bytes` that are parsed and filtered in parallel by a pool of
+    worker processes, while the next pieces are read from disk. Filtered chunks
+    are yielded in file order, indexed by row number in the file as with
+    stream_and_filter. At most two pieces per worker are in flight at a time,
+    which bounds memory use. With a single worker the pieces are processed in
+    this process, without a pool.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        reference_point (tuple): A tuple (latitude, longitude) for the reference location.
+        max_distance_km (float): The maximum distance in kilometers for points to be included.
+        max_workers (int, optional): The number of worker processes; defaults to the CPU count.
+        chunksize_bytes (int): The approximate number of bytes parsed per piece.
+
+    Yields:
+        pandas.DataFrame: The filtered points of one non-empty piece, with an
+                          additional 'distance_km' column (possibly no rows).
+
+    Raises:
+        pandas.errors.EmptyDataError: If the file is empty.
+        ValueError: If the file does not contain 'latitude' and 'longitude' columns.
+    """
+    usecols = _input_usecols(file_path)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    pieces = _iter_chunk_bytes(file_path, chunksize_bytes)
+
+    rows_before = 0
+    def offset_index(result):
+        # Number rows by their position in the file, not in their piece
+        nonlocal rows_before
+        filtered, n_rows = result
+        if n_rows:
+            filtered.index += rows_before
+        rows_before += n_rows
+        return filtered if n_rows else None
+
+    if max_workers <= 1:
+        for chunk_bytes in pieces:
+            filtered = offset_index(_filter_chunk(chunk_bytes, reference_point, max_distance_km, usecols))
+            if filtered is not None:
+                yield filtered
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for chunk_bytes in pieces:
+            pending.append(executor.submit(_filter_chunk, chunk_bytes, reference_point, max_distance_km, usecols))
+            if len(pending) < 2 * max_workers:
+                continue
+            filtered = offset_index(pending.popleft().result())
+            if filtered is not None:
+                yield filtered
+        while pending:
+            filtered = offset_index(pending.popleft().result())
+            if filtered is not None:
+                yield filtered
+
+class ProximityIndex:
+    """
+    Spatial index over geodetic points for repeated proximity queries.
+
+    Building the index costs O(N log N) once; each query is then O(log N + k)
+    instead of the O(N) scan done by filter_by_proximity. scikit-learn's BallTree
+    with the haversine metric is used when available, otherwise SciPy's cKDTree
+    over 3D unit-sphere coordinates. Small datasets (fewer than `min_points`
+    valid points) or environments without either library fall back to a linear scan.
+
+    Example:
+        index = ProximityIndex(geodetic_data)
+        near_camp = index.query(CAMP_LOCATION, max_distance_km=5)
+    """
+
+    def __init__(self, data, leaf_size=40, min_points=PROXIMITY_INDEX_MIN_POINTS):
+        """
+        Args:
+            data (pandas.DataFrame): DataFrame containing geodetic data with
+                                     'latitude' and 'longitude' columns.
+            leaf_size (int): Leaf size passed to the underlying tree.
+            min_points (int): Minimum number of valid points for which a tree is built.
+
+        Raises:
+            ValueError: If the data does not contain 'latitude' and 'longitude' columns.
+        """
+        if data is None or not {'latitude', 'longitude'}.issubset(data.columns):
+            raise ValueError("Data must contain 'latitude' and 'longitude' columns for proximity indexing.")
+
+        self.data = data
+        lats, lons = _coordinate_arrays(data)
+        # Rows with invalid coordinates are left out of the index entirely
+        self._positions = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons)))
+        self._lats_rad = np.radians(lats[self._positions])
+        self._lons_rad = np.radians(lons[self._positions])
+        self._tree = None
+        self.backend = 'linear'
+
+        if len(self._positions) >= min_points:
+            self._build_tree(leaf_size)
+
+    def _build_tree(self, leaf_size):
+        """Builds a BallTree if scikit-learn is installed, else a cKDTree if SciPy is."""
+        lats_rad, lons_rad = self._lats_rad, self._lons_rad
+        try:
+            from sklearn.neighbors import BallTree
+            self._tree = BallTree(np.column_stack((lats_rad, lons_rad)), leaf_size=leaf_size, metric='haversine')
+            self.backend = 'balltree'
+            return
+        except ImportError:
+            pass
         try:
-            # Ensure latitude and longitude are valid numbers before calculation
-            lat = float(row['latitude'])
-            lon = float(row['longitude'])
-            return geodesic(reference_point, (lat, lon)).km
-        except (ValueError, TypeError) as e: # Catch errors from invalid lat/lon values or types
-            print(f"Warning: Could not calculate distance for row: {row}. Error: {e}. Skipping.")
-            return float('inf') # Assign infinity to ensure it's filtered out
+            from scipy.spatial import cKDTree
+            # Euclidean distances between unit-sphere points are chord lengths,
+            # which grow monotonically with the great-circle distance.
+            self._tree = cKDTree(_unit_vectors(lats_rad, lons_rad), leafsize=leaf_size)
+            self.backend = 'ckdtree'
+        except ImportError:
+            print("Warning: Neither scikit-learn nor SciPy is installed. Using a linear scan for proximity queries.")
+
+    def query(self, reference_point, max_distance_km=MAX_DISTANCE_KM):
+        """
+        Returns the points within `max_distance_km` of `reference_point`.
+
+        Args:
+            reference_point (tuple): A tuple (latitude, longitude) for the reference location.
+            max_distance_km (float): The maximum distance in kilometers for points to be included.
+
+        Returns:
+            pandas.DataFrame: The matching rows, in their original order, with an
+                              additional 'distance_km' column.
+        """
+        ref_lat_rad, ref_lon_rad = _reference_radians(reference_point)
+        angle = max_distance_km / EARTH_RADIUS_KM # Search radius in radians on the unit sphere
+
+        if self.backend == 'balltree':
+            indices, distances = self._tree.query_radius([[ref_lat_rad, ref_lon_rad]], r=angle, return_distance=True)
+            indices, d_km = indices[0], distances[0] * EARTH_RADIUS_KM
+        else:
+            if self.backend == 'ckdtree':
+                chord = 2 * np.sin(min(angle, np.pi) / 2)
+                indices = np.asarray(self._tree.query_ball_point(_unit_vectors(ref_lat_rad, ref_lon_rad)[0], r=chord), dtype=np.intp)
+            else:
+                indices = np.arange(len(self._positions))
+            d_km = _haversine_km(ref_lat_rad, ref_lon_rad, self._lats_rad[indices], self._lons_rad[indices])
+            within = d_km <= max_distance_km
+            indices, d_km = indices[within], d_km[within]
+
+        # Restore the original row order of the input data
+        order = np.argsort(indices, kind='stable')
+        return self.data.iloc[self._positions[indices[order]]].assign(distance_km=d_km[order])
+
+def _unit_vectors(lats_rad, lons_rad):
+    """Converts latitudes/longitudes in radians to 3D Cartesian points on the unit sphere."""
+    cos_lat = np.cos(lats_rad)
+    return np.column_stack((cos_lat * np.cos(lons_rad), cos_lat * np.sin(lons_rad), np.sin(lats_rad)))
+
+def _marker_rows(data):
+    """
+    Builds the [latitude, longitude, popup, tooltip] rows read by POINT_MARKER_CALLBACK.
+    Descriptions are HTML-escaped like folium popups; points with invalid
+    coordinates are skipped with a warning.
 
-    # Apply distance calculation
-    data = data.copy() # Work on a copy to avoid SettingWithCopyWarning
-    data['distance_km'] = data.apply(calculate_distance, axis=1)
+    Args:
+        data (pandas.DataFrame): DataFrame with 'latitude', 'longitude', and optionally
+                                 'description' columns.
 
-    # Filter data based on calculated distance
-    filtered_data = data[data['distance_km'] <= max_distance_km].copy() # Use .copy() for the final slice as well
-    return filtered_data
+    Returns:
+        list: One [lat, lon, popup, tooltip] list per valid point.
+    """
+    lats = pd.to_numeric(data['latitude'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    lons = pd.to_numeric(data['longitude'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = np.isfinite(lats) & np.isfinite(lons)
+    if not valid.all():
+        print(f"Warning: Could not plot {int(np.count_nonzero(~valid))} point(s) with invalid coordinates.")
+
+    if 'description' in data.columns:
+        descriptions = data['description'].to_numpy()[valid]
+    else:
+        descriptions = [None] * int(np.count_nonzero(valid))
+
+    rows = []
+    for lat, lon, description in zip(lats[valid].tolist(), lons[valid].tolist(), descriptions):
+        if pd.isna(description):
+            rows.append([lat, lon, 'Geodetic Point', f"Lat: {lat}, Lon: {lon}"])
+        else:
+            text = html.escape(str(description))
+            rows.append([lat, lon, text, text])
+    return rows
+
+# Rendered maps by content digest, least recently used first: {digest: (folium.Map, html)}
+_map_html_cache = OrderedDict()
+
+def _map_cache_digest(cache_key, data, reference_point):
+    """Hashes everything a rendered map depends on into a cache key for create_map."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((cache_key, tuple(reference_point))).encode())
+    if data is not None:
+        digest.update(repr([(col, str(dtype)) for col, dtype in data.dtypes.items()]).encode())
+        # Hash the values rather than the raw buffers: object columns hold pointers
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _inject_point_markers(map_html, map_name, rows):
+    """
+    Adds the point markers to an already rendered map page as one script block:
+    the rows are serialized once and POINT_MARKER_CALLBACK builds each marker in
+    the browser, instead of rendering a folium.Marker template per point.
+
+    Args:
+        map_html (str): The rendered HTML of the map.
+        map_name (str): The JavaScript variable name of the Leaflet map.
+        rows (list): [lat, lon, popup, tooltip] rows from _marker_rows.
 
-def create_map(data, reference_point, map_file_path='camp_map.html'):
+    Returns:
+        str: The HTML with the markers added at the end of the map's script.
+    """
+    # "</" inside a string literal would end the <script> element early
+    rows_json = json.dumps(rows).replace("</", "<\\/")
+    markers_js = (
+        f"    var point_marker = {POINT_MARKER_CALLBACK};\n"
+        f"    var point_rows = {rows_json};\n"
+        f"    for (var i = 0; i < point_rows.length; i++) {{\n"
+        f"        point_marker(point_rows[i]).addTo({map_name});\n"
+        f"    }}\n"
+    )
+    # The map itself is created in the last script of the page
+    script_end = map_html.rfind("</script>")
+    return map_html[:script_end] + markers_js + map_html[script_end:]
+
+def create_map(data, reference_point, map_file_path='camp_map.html', cache_key=None):
     """
     Creates an HTML map visualizing geodetic points and a reference point using Folium.
     If data is empty, it creates a map with only the reference point.
@@ -144,20 +773,48 @@ def create_map(data, reference_point, map_file_path='camp_map.html'):
                                  'description' columns for the points to plot.
         reference_point (tuple): A tuple (latitude, longitude) for the central reference marker.
         map_file_path (str): The file path where the HTML map will be saved.
+        cache_key (hashable, optional): Enables caching of the rendered HTML. When the
+                                 same key, data and reference point were rendered
+                                 before, the cached HTML is written without rebuilding the map.
 
     Returns:
         folium.Map or None: The Folium map object, or None if map creation fails.
     """
-    # Determine map center: if data is available, center on mean of points, else on reference_point
+    digest = None
+    if cache_key is not None:
+        digest = _map_cache_digest(cache_key, data, reference_point)
+        if digest in _map_html_cache:
+            _map_html_cache.move_to_end(digest)
+            camp_map, map_html = _map_html_cache[digest]
+            try:
+                with open(map_file_path, 'w', encoding='utf-8') as f:
+                    f.write(map_html)
+                print(f"Map saved to {map_file_path} (from cache)")
+                return camp_map
+            except Exception as e:
+                print(f"Error saving map to {map_file_path}: {e}")
+                return None
+
+    # Determine map center: if data is available, center on mean of points, else on reference_point.
+    # Coordinates are numeric already (see load_geodetic_data and filter_by_proximity), so one
+    # finiteness pass and one mean per column are enough; points without coordinates are ignored.
+    map_center = reference_point # Fallback if data is problematic or empty
     if data is not None and not data.empty and \
-       all(col in data.columns for col in ['latitude', 'longitude']) and \
-       pd.to_numeric(data['latitude'], errors='coerce').notna().all() and \
-       pd.to_numeric(data['longitude'], errors='coerce').notna().all():
-        map_center = [data['latitude'].mean(), data['longitude'].mean()]
-    else: # Fallback if data is problematic or empty
-        map_center = reference_point
-        if data is None or data.empty:
-            print("No data to plot on map. Map will center on the reference point.")
+       all(col in data.columns for col in ['latitude', 'longitude']):
+        lat_arr = data['latitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+        lon_arr = data['longitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(lat_arr) & np.isfinite(lon_arr)
+        if valid.all():
+            map_center = [float(lat_arr.mean()), float(lon_arr.mean())]
+        elif valid.any():
+            map_center = [float(lat_arr[valid].mean()), float(lon_arr[valid].mean())]
+    elif data is None or data.empty:
+        print("No data to plot on map. Map will center on the reference point.")
+
+    # Folium is imported here rather than at module level, so callers that only load
+    # and filter data never pay for importing it (and Jinja2/branca behind it).
+    import folium
+    from folium.plugins import FastMarkerCluster
 
     camp_map = folium.Map(location=map_center, zoom_start=12)
 
@@ -170,20 +827,16 @@ def create_map(data, reference_point, map_file_path='camp_map.html'):
     ).add_to(camp_map)
 
     # Add markers for each geodetic point from the filtered data
-    if data is not None and not data.empty:
-        for _, row in data.iterrows():
-            try:
-                lat = float(row['latitude'])
-                lon = float(row['longitude'])
-                folium.Marker(
-                    location=(lat, lon),
-                    popup=row.get('description', 'Geodetic Point'), # Use .get for safer access to 'description'
-                    tooltip=row.get('description', f"Lat: {lat}, Lon: {lon}"), # Added tooltip
-                    icon=folium.Icon(color="green", icon="leaf") # Changed icon for points
-                ).add_to(camp_map)
-            except (ValueError, TypeError) as e:
-                print(f"Warning: Could not plot point for row: {row}. Invalid coordinates. Error: {e}")
-
+    if data is not None and len(data) >= FAST_MARKER_CLUSTER_MIN_POINTS:
+        # Many points: one clustered layer whose markers are built in the browser
+        # from a single JS array, instead of one rendered template per marker
+        FastMarkerCluster(_marker_rows(data), callback=POINT_MARKER_CALLBACK).add_to(camp_map)
+        point_rows = None
+    elif data is not None and not data.empty:
+        # Fewer points: unclustered markers, added to the rendered page below
+        point_rows = _marker_rows(data)
+    else:
+        point_rows = None
 
     # Handle case where data was provided but was empty or invalid for map markers
     if data is not None and data.empty:
@@ -202,7 +855,15 @@ def create_map(data, reference_point, map_file_path='camp_map.html'):
         # The map will be created with just the camp location.
 
     try:
-        camp_map.save(map_file_path)
+        # Render the folium page (base map and camp marker) once, then add the point markers
+        map_html = camp_map.get_root().render()
+        if point_rows:
+            map_html = _inject_point_markers(map_html, camp_map.get_name(), point_rows)
+        Path(map_file_path).write_text(map_html, encoding='utf-8')
+        if digest is not None:
+            _map_html_cache[digest] = (camp_map, map_html)
+            if len(_map_html_cache) > MAP_CACHE_SIZE:
+                _map_html_cache.popitem(last=False) # Evict the least recently used map
         print(f"Map saved to {map_file_path}")
         return camp_map
     except Exception as e:
@@ -213,40 +874,44 @@ def create_map(data, reference_point, map_file_path='camp_map.html'):
 def main():
     """
     Main function to orchestrate the geodetic data processing workflow.
-    It loads data, filters it by proximity to a camp, saves the filtered data,
-    and generates a map.
+    It filters the data file by proximity to a camp in parallel chunks, saves the
+    filtered data, and generates a map.
     """
     # Configuration for file paths
     input_csv_file = 'geodetic_data.csv'       # Source data
     filtered_csv_file = 'filtered_geodetic_data.csv' # Output for filtered data
     output_map_file = 'camp_map.html'          # Output for HTML map
 
-    # Load the geodetic data
-    geodetic_data = load_geodetic_data(input_csv_file)
-
-    if geodetic_data is None:
+    # Filter the geodetic data by proximity to the camp, chunks in parallel across the CPUs.
+    # MAX_DISTANCE_KM is used by default from global scope
+    try:
+        filtered_chunks = list(filter_file(input_csv_file, CAMP_LOCATION))
+    except Exception as e: # Missing columns, empty or unreadable file
+        print(f"Error loading data from {input_csv_file}: {e}")
         print("Failed to load geodetic data. Cannot proceed with filtering and mapping. Exiting.")
         # Optionally, create a map with only the camp location if data loading fails
         create_map(pd.DataFrame(), CAMP_LOCATION, map_file_path=output_map_file)
         return # Exit if data loading failed
 
-    if geodetic_data.empty:
+    if not filtered_chunks:
         print("Geodetic data file was loaded but is empty. No points to filter.")
         # Create a map showing only the camp location
-        create_map(geodetic_data, CAMP_LOCATION, map_file_path=output_map_file)
+        create_map(pd.DataFrame(), CAMP_LOCATION, map_file_path=output_map_file)
         return # Exit if data is empty
 
-    print("Geodetic data loaded successfully.")
-
-    # Filter data by proximity to the camp
-    # MAX_DISTANCE_KM is used by default from global scope
-    filtered_data = filter_by_proximity(geodetic_data, CAMP_LOCATION)
+    print("Geodetic data loaded and filtered successfully.")
+    filtered_data = pd.concat(filtered_chunks)
 
     if not filtered_data.empty:
         print(f"Filtered {len(filtered_data)} points within {MAX_DISTANCE_KM} km of the camp.")
         # Save filtered data to a new CSV file
         try:
-            filtered_data.to_csv(filtered_csv_file, index=False)
+            # A fixed column list and float format spare to_csv per-column dtype inspection
+            # and repr() of every float; the large buffer keeps write syscalls few.
+            output_columns = [col for col in FILTERED_CSV_COLUMNS if col in filtered_data.columns]
+            with open(filtered_csv_file, 'w', newline='', buffering=FILTERED_CSV_BUFFER_SIZE) as fh:
+                filtered_data.to_csv(fh, index=False, columns=output_columns,
+                                     float_format=FILTERED_CSV_FLOAT_FORMAT, lineterminator='\n')
             print(f"Filtered data saved to '{filtered_csv_file}'")
         except Exception as e:
             print(f"Error saving filtered data to {filtered_csv_file}: {e}")
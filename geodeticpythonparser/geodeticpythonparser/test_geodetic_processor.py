@@ -1,9 +1,12 @@
 import unittest
 from unittest.mock import patch, mock_open, MagicMock, call
+import numpy as np
 import pandas as pd
 from pandas.testing import assert_frame_equal
 from io import StringIO
+import importlib.util
 import os
+import subprocess
 import sys
 
 # Assuming geodetic_processor.py is in the same directory or PYTHONPATH is set.
@@ -56,8 +59,33 @@ class TestGeodeticProcessor(unittest.TestCase):
         for f_path in files_to_remove:
             if os.path.exists(f_path):
                 os.remove(f_path)
+        geodetic_processor._map_html_cache.clear()
 
 
+    # --- Tests for install_and_import ---
+    @patch('subprocess.check_call')
+    def test_install_and_import_skips_pip_for_installed_package(self, mock_check_call):
+        module = geodetic_processor.install_and_import("json")
+        mock_check_call.assert_not_called()
+        self.assertEqual(module.__name__, "json")
+
+    @patch('importlib.import_module')
+    @patch('importlib.util.find_spec', return_value=None)
+    @patch('subprocess.check_call')
+    @patch('builtins.print')
+    def test_install_and_import_installs_missing_package(self, mock_print, mock_check_call, mock_find_spec, mock_import_module):
+        geodetic_processor.install_and_import("missing_package")
+        mock_check_call.assert_called_once_with([sys.executable, "-m", "pip", "install", "missing_package"])
+        mock_import_module.assert_called_once_with("missing_package")
+
+    def test_import_does_not_load_folium(self):
+        # Folium is only imported by create_map, so data-only callers never load it
+        script = "import sys, geodetic_processor; print('folium' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(geodetic_processor.__file__)))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "False")
+
     # --- Tests for create_sample_file ---
     @patch('pandas.DataFrame.to_csv')
     @patch('builtins.print')
@@ -90,7 +118,7 @@ class TestGeodeticProcessor(unittest.TestCase):
 
     # --- Tests for load_geodetic_data ---
     @patch('os.path.exists', return_value=True)
-    @patch('pandas.read_csv')
+    @patch('geodetic_processor._read_csv')
     @patch('builtins.print')
     def test_load_valid_data(self, mock_print, mock_read_csv, mock_exists):
         mock_read_csv.return_value = self.sample_df.copy()
@@ -103,9 +131,22 @@ class TestGeodeticProcessor(unittest.TestCase):
         self.assertEqual(len(relevant_print_calls), 0)
 
 
+    @patch('os.path.exists', return_value=True)
+    @patch('geodetic_processor._read_csv')
+    @patch('builtins.print')
+    def test_load_data_converts_coordinates_and_drops_invalid_rows(self, mock_print, mock_read_csv, mock_exists):
+        mock_read_csv.return_value = self.proximity_test_data.copy()
+
+        df = geodetic_processor.load_geodetic_data(self.test_csv_file)
+
+        self.assertTrue(pd.api.types.is_float_dtype(df['latitude']))
+        self.assertTrue(pd.api.types.is_float_dtype(df['longitude']))
+        self.assertListEqual(list(df.index), [0, 1, 2, 3]) # Points 5-7 have invalid coordinates
+        mock_print.assert_any_call("Warning: Dropped 3 row(s) with missing or invalid coordinates.")
+
     @patch('os.path.exists', side_effect=[False, True]) # First call False (by load_geodetic_data), second True (by pd.read_csv after sample created)
     @patch('geodetic_processor.create_sample_file')
-    @patch('pandas.read_csv')
+    @patch('geodetic_processor._read_csv')
     @patch('builtins.print')
     def test_load_data_file_not_found_creates_sample_and_loads(self, mock_print, mock_read_csv, mock_create_sample, mock_exists):
         mock_read_csv.return_value = self.sample_df.copy()
@@ -130,7 +171,7 @@ class TestGeodeticProcessor(unittest.TestCase):
         mock_print.assert_any_call(f"File {self.test_csv_file} not found. Creating a sample file...")
 
     @patch('os.path.exists', return_value=True)
-    @patch('pandas.read_csv')
+    @patch('geodetic_processor._read_csv')
     @patch('builtins.print')
     def test_load_data_missing_columns(self, mock_print, mock_read_csv, mock_exists):
         df_missing_cols = pd.DataFrame({'longitude': [1, 2], 'description': ['A', 'B']})
@@ -142,7 +183,7 @@ class TestGeodeticProcessor(unittest.TestCase):
         mock_print.assert_any_call("Error loading data: The file must contain 'latitude' and 'longitude' columns.")
 
     @patch('os.path.exists', return_value=True)
-    @patch('pandas.read_csv', side_effect=pd.errors.EmptyDataError)
+    @patch('geodetic_processor._read_csv', side_effect=pd.errors.EmptyDataError)
     @patch('builtins.print')
     def test_load_data_empty_csv(self, mock_print, mock_read_csv, mock_exists):
         result_df = geodetic_processor.load_geodetic_data(self.test_csv_file)
@@ -151,7 +192,7 @@ class TestGeodeticProcessor(unittest.TestCase):
 
     @patch('os.path.exists', side_effect=[False, False])
     @patch('geodetic_processor.create_sample_file', MagicMock())
-    @patch('pandas.read_csv', side_effect=FileNotFoundError("Mocked FileNotFoundError"))
+    @patch('geodetic_processor._read_csv', side_effect=FileNotFoundError("Mocked FileNotFoundError"))
     @patch('builtins.print')
     def test_load_data_filenotfound_after_sample_creation_attempt(self, mock_print, mock_read_csv, mock_exists):
         result_df = geodetic_processor.load_geodetic_data(self.test_csv_file)
@@ -159,6 +200,38 @@ class TestGeodeticProcessor(unittest.TestCase):
         geodetic_processor.create_sample_file.assert_called_once_with(self.test_csv_file)
         mock_print.assert_any_call(f"Error: The file {self.test_csv_file} was not found even after attempting to create a sample.")
 
+    # --- Tests for _read_csv ---
+    def _write_test_csv(self, content):
+        with open(self.test_csv_file, 'w', newline='') as f:
+            f.write(content)
+
+    def _assert_read_csv_parses_known_columns(self):
+        self._write_test_csv("latitude,longitude,elevation,description\n56.7110,36.7615,120,Point A\n56.7130,36.7600,118,Point B\n")
+        df = geodetic_processor._read_csv(self.test_csv_file)
+        self.assertListEqual(list(df.columns), ['latitude', 'longitude', 'description']) # 'elevation' is not parsed
+        self.assertEqual(getattr(df['latitude'].dtype, 'numpy_dtype', df['latitude'].dtype), np.float32) # NumPy or Arrow float32
+        np.testing.assert_allclose(df['latitude'].to_numpy(dtype=np.float32), [56.7110, 56.7130], rtol=1e-7)
+        self.assertListEqual(df['description'].tolist(), ['Point A', 'Point B'])
+
+    @unittest.skipUnless(geodetic_processor._HAS_PYARROW, "pyarrow is not installed")
+    def test_read_csv_pyarrow_reader(self):
+        self._assert_read_csv_parses_known_columns()
+
+    @unittest.skipUnless(geodetic_processor._HAS_PYARROW, "pyarrow is not installed")
+    def test_read_csv_pyarrow_reader_returns_arrow_backed_columns(self):
+        self._write_test_csv("latitude,longitude\n56.7110,36.7615\n")
+        df = geodetic_processor._read_csv(self.test_csv_file)
+        self.assertIsInstance(df['latitude'].dtype, pd.ArrowDtype)
+
+    @patch('geodetic_processor._HAS_PYARROW', False)
+    def test_read_csv_c_engine_fallback(self):
+        self._assert_read_csv_parses_known_columns()
+
+    def test_read_csv_empty_file_raises_empty_data_error(self):
+        self._write_test_csv("")
+        with self.assertRaises(pd.errors.EmptyDataError):
+            geodetic_processor._read_csv(self.test_csv_file)
+
     # --- Tests for filter_by_proximity ---
     def test_filter_points_inside_and_outside_radius(self):
         input_df = self.proximity_test_data.copy()
@@ -191,6 +264,19 @@ class TestGeodeticProcessor(unittest.TestCase):
                            close_data[['latitude', 'longitude', 'description']].reset_index(drop=True),
                            check_dtype=False)
 
+    def test_filter_bounding_box_keeps_points_across_antimeridian_and_pole(self):
+        # Each point is ~2 km from its reference but far away in raw degree differences
+        cases = [((60.0, 179.99), (60.0, -179.97)), ((89.99, 0.0), (89.99, 170.0))]
+        for reference_point, (lat, lon) in cases:
+            df = pd.DataFrame({'latitude': [lat], 'longitude': [lon]})
+            filtered_df = geodetic_processor.filter_by_proximity(df, reference_point, self.max_distance)
+            self.assertEqual(len(filtered_df), 1, f"Point {(lat, lon)} dropped for reference {reference_point}")
+
+    def test_filter_does_not_modify_input(self):
+        input_df = self.sample_df.copy()
+        geodetic_processor.filter_by_proximity(input_df, self.camp_location, self.max_distance)
+        assert_frame_equal(input_df, self.sample_df)
+
     def test_filter_empty_input_dataframe(self):
         empty_df = pd.DataFrame(columns=['latitude', 'longitude', 'description'])
         filtered_df = geodetic_processor.filter_by_proximity(empty_df, self.camp_location, self.max_distance)
@@ -213,20 +299,126 @@ class TestGeodeticProcessor(unittest.TestCase):
         valid_descriptions = ['Point 1 (In)', 'Point 2 (In)', 'Point 4 (In)']
         self.assertListEqual(sorted(list(filtered_df['description'])), sorted(valid_descriptions))
 
-        printed_output = "".join(c[0][0] for c in mock_print.call_args_list)
-        self.assertIn("Warning: Could not calculate distance for row", printed_output)
-        self.assertIn("Point 5 (Invalid Lat)", printed_output)
-        self.assertIn("Point 6 (None Lat)", printed_output)
-        self.assertIn("Point 7 (Invalid Lon)", printed_output)
+        # Points 5, 6 and 7 have invalid coordinates and are reported in a single warning
+        mock_print.assert_any_call("Warning: Could not calculate distance for 3 row(s) with invalid coordinates. Skipping.")
+
+    def test_haversine_matches_known_distance(self):
+        # One degree of latitude along a meridian is R * pi / 180 kilometers
+        distances = geodetic_processor._haversine_km(0.0, 0.0, np.radians([1.0, 0.0]), np.radians([0.0, 0.0]))
+        self.assertAlmostEqual(distances[0], geodetic_processor.EARTH_RADIUS_KM * np.pi / 180, places=6)
+        self.assertEqual(distances[1], 0.0)
+
+
+    def _assert_float32_distances_within_a_meter(self):
+        lats = self.sample_df['latitude'].to_numpy()
+        lons = self.sample_df['longitude'].to_numpy()
+        ref_lat_rad, ref_lon_rad = geodetic_processor.CAMP_LATLON_RAD
+        d64 = geodetic_processor._haversine_km(ref_lat_rad, ref_lon_rad, np.radians(lats), np.radians(lons))
+        d32 = geodetic_processor._haversine_km(ref_lat_rad, ref_lon_rad,
+                                               np.radians(lats.astype(np.float32)), np.radians(lons.astype(np.float32)))
+        self.assertEqual(d32.dtype, np.float32)
+        np.testing.assert_allclose(d32, d64, rtol=0, atol=0.001) # 1 m
+
+    def test_haversine_float32_within_a_meter_of_float64(self):
+        self._assert_float32_distances_within_a_meter()
+
+    @patch('geodetic_processor._haversine_km_numba', None)
+    def test_haversine_numpy_float32_within_a_meter_of_float64(self):
+        self._assert_float32_distances_within_a_meter()
+
+    @unittest.skipUnless(geodetic_processor._haversine_km_numba is not None, "Numba is not installed")
+    def test_haversine_numba_kernel_matches_numpy(self):
+        lats_rad = np.radians(np.array([56.7110, 56.7000, 50.0, np.nan, -33.9]))
+        lons_rad = np.radians(np.array([36.7615, 36.7500, 30.0, 36.79, 151.2]))
+        ref_lat_rad, ref_lon_rad = np.radians(self.camp_location[0]), np.radians(self.camp_location[1])
+        out = np.empty(len(lats_rad))
+        geodetic_processor._haversine_km_numba(ref_lat_rad, ref_lon_rad, lats_rad, lons_rad, out)
+        expected = geodetic_processor._haversine_km_numpy(ref_lat_rad, ref_lon_rad, lats_rad, lons_rad)
+        np.testing.assert_allclose(out, expected, rtol=1e-12) # NaN positions must match as well
+
+    def _assert_camp_kernel_matches_general_kernel(self, camp_kernel):
+        lats_rad = np.radians(np.array([56.7110, 56.7000, 50.0, np.nan, -33.9]))
+        lons_rad = np.radians(np.array([36.7615, 36.7500, 30.0, 36.79, 151.2]))
+        expected = geodetic_processor._haversine_km_numpy(*geodetic_processor.CAMP_LATLON_RAD, lats_rad, lons_rad)
+        np.testing.assert_allclose(camp_kernel(lats_rad, lons_rad), expected, rtol=1e-12)
+        self.assertEqual(camp_kernel(lats_rad.astype(np.float32), lons_rad.astype(np.float32)).dtype, np.float32)
+
+    def test_haversine_from_camp_matches_general_kernel(self):
+        self._assert_camp_kernel_matches_general_kernel(geodetic_processor._haversine_from_camp_km)
+
+    @patch('geodetic_processor.njit', None)
+    def test_haversine_from_camp_numpy_matches_general_kernel(self):
+        self._assert_camp_kernel_matches_general_kernel(geodetic_processor._make_haversine_from_reference_km(*self.camp_location))
+
+    @unittest.skipUnless(geodetic_processor._haversine_ext is not None, "The _haversine extension is not built")
+    def test_haversine_extension_matches_numpy(self):
+        for float_type in (np.float64, np.float32):
+            lats_rad = np.radians(np.array([56.7110, 56.7000, 50.0, np.nan, -33.9])).astype(float_type)
+            lons_rad = np.radians(np.array([36.7615, 36.7500, 30.0, 36.79, 151.2])).astype(float_type)
+            out = np.empty_like(lats_rad)
+            geodetic_processor._haversine_ext.haversine_km(*geodetic_processor.CAMP_LATLON_RAD, lats_rad, lons_rad, out)
+            expected = geodetic_processor._haversine_km_numpy(*geodetic_processor.CAMP_LATLON_RAD, lats_rad.astype(np.float64), lons_rad.astype(np.float64))
+            np.testing.assert_allclose(out, expected, rtol=1e-6 if float_type is np.float32 else 1e-12)
+
+    @patch('geodetic_processor._haversine_ext')
+    @patch('geodetic_processor.njit', None)
+    def test_haversine_uses_extension_without_numba(self, mock_ext):
+        lats_rad, lons_rad = np.radians([56.7110]), np.radians([36.7615])
+        geodetic_processor._haversine_km(*geodetic_processor.CAMP_LATLON_RAD, lats_rad, lons_rad)
+        mock_ext.haversine_km.assert_called_once()
+
+    # --- Tests for ProximityIndex ---
+    def _assert_index_matches_filter(self, index):
+        input_df = self.proximity_test_data
+        expected = geodetic_processor.filter_by_proximity(input_df, self.camp_location, self.max_distance)
+        result = index.query(self.camp_location, self.max_distance)
+        assert_frame_equal(result[['latitude', 'longitude', 'description']], expected[['latitude', 'longitude', 'description']])
+        np.testing.assert_allclose(result['distance_km'], expected['distance_km'], rtol=1e-9)
+
+    @patch('builtins.print')
+    def test_proximity_index_linear_scan_for_small_data(self, mock_print):
+        index = geodetic_processor.ProximityIndex(self.proximity_test_data)
+        self.assertEqual(index.backend, 'linear')
+        self._assert_index_matches_filter(index)
+
+    @unittest.skipUnless(importlib.util.find_spec('sklearn'), "scikit-learn is not installed")
+    @patch('builtins.print')
+    def test_proximity_index_balltree_matches_filter(self, mock_print):
+        index = geodetic_processor.ProximityIndex(self.proximity_test_data, min_points=0)
+        self.assertEqual(index.backend, 'balltree')
+        self._assert_index_matches_filter(index)
 
+    @unittest.skipUnless(importlib.util.find_spec('scipy'), "SciPy is not installed")
+    @patch('builtins.print')
+    def test_proximity_index_ckdtree_fallback_matches_filter(self, mock_print):
+        import scipy.spatial # Import before hiding scikit-learn so the fallback can load it
+        with patch.dict(sys.modules, {'sklearn.neighbors': None}):
+            index = geodetic_processor.ProximityIndex(self.proximity_test_data, min_points=0)
+        self.assertEqual(index.backend, 'ckdtree')
+        self._assert_index_matches_filter(index)
+
+    def test_proximity_index_missing_columns_raises(self):
+        with self.assertRaises(ValueError):
+            geodetic_processor.ProximityIndex(pd.DataFrame({'description': ['A', 'B']}))
 
     # --- Tests for create_map ---
+    def _mock_map_instance(self, mock_folium_map):
+        # create_map renders the page itself and appends point markers to the last script
+        mock_map_instance = MagicMock()
+        mock_map_instance.get_name.return_value = "map_test"
+        mock_map_instance.get_root.return_value.render.return_value = "<html><script>\n</script></html>"
+        mock_folium_map.return_value = mock_map_instance
+        return mock_map_instance
+
+    def _read_map_file(self, map_file_path):
+        with open(map_file_path, encoding='utf-8') as f:
+            return f.read()
+
     @patch('folium.Map')
     @patch('folium.Marker')
     @patch('builtins.print')
     def test_create_map_empty_data_creates_map_with_camp_marker(self, mock_print, mock_marker, mock_folium_map):
-        mock_map_instance = MagicMock()
-        mock_folium_map.return_value = mock_map_instance
+        self._mock_map_instance(mock_folium_map)
         empty_df = pd.DataFrame(columns=['latitude', 'longitude', 'description'])
 
         geodetic_processor.create_map(empty_df, self.camp_location, "test_map.html")
@@ -239,15 +431,14 @@ class TestGeodeticProcessor(unittest.TestCase):
         )
         self.assertTrue(camp_marker_found, "Camp marker not added or details incorrect for empty data map.")
 
-        mock_map_instance.save.assert_called_once_with("test_map.html")
+        self.assertEqual(self._read_map_file("test_map.html"), "<html><script>\n</script></html>")
 
 
     @patch('folium.Map')
     @patch('folium.Marker')
     @patch('builtins.print')
     def test_create_map_with_data_plots_points_and_camp(self, mock_print, mock_marker, mock_folium_map):
-        mock_map_instance = MagicMock()
-        mock_folium_map.return_value = mock_map_instance
+        self._mock_map_instance(mock_folium_map)
 
         data_for_map = self.proximity_test_data[
             self.proximity_test_data['description'].isin(['Point 1 (In)', 'Point 4 (In)'])
@@ -260,49 +451,201 @@ class TestGeodeticProcessor(unittest.TestCase):
         expected_map_center = [data_for_map['latitude'].mean(), data_for_map['longitude'].mean()]
         mock_folium_map.assert_called_once_with(location=expected_map_center, zoom_start=12)
 
-        self.assertEqual(mock_marker.call_count, len(data_for_map) + 1)
+        # Only the camp is a folium.Marker; the points are injected into the map's script
+        self.assertEqual(mock_marker.call_count, 1)
+        self.assertEqual(mock_marker.call_args.kwargs.get('popup'), "Student Camp Location")
+
+        map_html = self._read_map_file("test_map_with_data.html")
+        self.assertIn('[56.711, 36.7615, "Point 1 (In)", "Point 1 (In)"]', map_html)
+        self.assertIn('[56.712, 36.76, "Point 4 (In)", "Point 4 (In)"]', map_html)
+        self.assertIn("point_marker(point_rows[i]).addTo(map_test);\n    }\n</script>", map_html)
+
+    @patch('builtins.print')
+    def test_create_map_escapes_descriptions_in_injected_script(self, mock_print):
+        data = pd.DataFrame({'latitude': [56.711], 'longitude': [36.7615], 'description': ['</script><b>Point</b>']})
+        geodetic_processor.create_map(data, self.camp_location, "test_map.html")
+
+        map_html = self._read_map_file("test_map.html")
+        self.assertNotIn('</script><b>', map_html)
+        self.assertIn('&lt;/script&gt;&lt;b&gt;Point&lt;/b&gt;', map_html)
+
+    @patch('folium.Map')
+    @patch('folium.Marker')
+    @patch('builtins.print')
+    def test_create_map_center_ignores_points_without_coordinates(self, mock_print, mock_marker, mock_folium_map):
+        self._mock_map_instance(mock_folium_map)
+        data = pd.DataFrame({'latitude': [56.71, np.nan, 56.73], 'longitude': [36.75, 36.76, np.nan]})
+
+        geodetic_processor.create_map(data, self.camp_location, "test_map.html")
 
-        camp_marker_found = any(call_args.kwargs.get('popup') == "Student Camp Location" for call_args in mock_marker.call_args_list)
-        self.assertTrue(camp_marker_found)
+        mock_folium_map.assert_called_once_with(location=[56.71, 36.75], zoom_start=12)
 
-        point_marker_found = any(call_args.kwargs.get('popup') == 'Point 1 (In)' for call_args in mock_marker.call_args_list)
-        self.assertTrue(point_marker_found)
+    @patch('folium.Map')
+    @patch('folium.Marker')
+    @patch('builtins.print')
+    def test_create_map_without_description_uses_default_labels(self, mock_print, mock_marker, mock_folium_map):
+        self._mock_map_instance(mock_folium_map)
+        geodetic_processor.create_map(pd.DataFrame({'latitude': [56.711], 'longitude': [36.7615]}), self.camp_location, "test_map.html")
 
-        mock_map_instance.save.assert_called_once_with("test_map_with_data.html")
+        self.assertIn('[56.711, 36.7615, "Geodetic Point", "Lat: 56.711, Lon: 36.7615"]', self._read_map_file("test_map.html"))
+
+    @patch('folium.plugins.FastMarkerCluster')
+    @patch('folium.Map')
+    @patch('folium.Marker')
+    @patch('builtins.print')
+    def test_create_map_many_points_uses_fast_marker_cluster(self, mock_print, mock_marker, mock_folium_map, mock_cluster):
+        self._mock_map_instance(mock_folium_map)
+        n_points = geodetic_processor.FAST_MARKER_CLUSTER_MIN_POINTS
+        many_points = pd.DataFrame({
+            'latitude': [56.7110] * n_points, 'longitude': [36.7615] * n_points,
+            'description': ['<Point>'] + [f'Point {i}' for i in range(1, n_points)]
+        })
+
+        geodetic_processor.create_map(many_points, self.camp_location, "test_map_with_data.html")
+
+        self.assertEqual(mock_marker.call_count, 1) # Only the camp marker is a folium.Marker
+        mock_cluster.assert_called_once()
+        rows = mock_cluster.call_args[0][0]
+        self.assertEqual(len(rows), n_points)
+        self.assertEqual(rows[0], [56.7110, 36.7615, '&lt;Point&gt;', '&lt;Point&gt;']) # Descriptions are HTML-escaped
+        self.assertEqual(mock_cluster.call_args.kwargs['callback'], geodetic_processor.POINT_MARKER_CALLBACK)
+
+    @patch('builtins.print')
+    def test_create_map_cache_key_reuses_rendered_html(self, mock_print):
+        first_map = geodetic_processor.create_map(self.sample_df, self.camp_location, "test_map.html", cache_key="camp")
+        with open("test_map.html", encoding='utf-8') as f:
+            first_html = f.read()
+
+        with patch('folium.Map') as mock_folium_map:
+            second_map = geodetic_processor.create_map(self.sample_df.copy(), self.camp_location, "test_map_with_data.html", cache_key="camp")
+            mock_folium_map.assert_not_called() # Served from the cache
+        self.assertIs(second_map, first_map)
+        with open("test_map_with_data.html", encoding='utf-8') as f:
+            self.assertEqual(f.read(), first_html)
+
+        # Different data must not hit the cache
+        with patch('folium.Map', return_value=MagicMock()) as mock_folium_map:
+            geodetic_processor.create_map(self.sample_df.head(2), self.camp_location, "test_map.html", cache_key="camp")
+            mock_folium_map.assert_called_once()
+
+    # --- Tests for stream_and_filter ---
+    @patch('builtins.print')
+    def test_stream_and_filter_matches_whole_file_filter(self, mock_print):
+        with open(self.test_csv_file, 'w', newline='') as f:
+            f.write("latitude,longitude,description\n"
+                    "56.7110,36.7615,Point 1 (In)\n"
+                    "56.7000,36.7500,Point 2 (In)\n"
+                    "50.0,30.0,Point 3 (Out)\n"
+                    "56.7120,36.7600,Point 4 (In)\n")
+
+        chunks = list(geodetic_processor.stream_and_filter(self.test_csv_file, self.camp_location, self.max_distance, chunksize=2))
+        expected = geodetic_processor.filter_by_proximity(
+            pd.read_csv(self.test_csv_file, dtype=geodetic_processor.COORDINATE_DTYPES), self.camp_location, self.max_distance)
+
+        self.assertEqual(len(chunks), 2)
+        assert_frame_equal(pd.concat(chunks), expected, check_dtype=False)
+
+    def test_stream_and_filter_missing_columns_raises(self):
+        with open(self.test_csv_file, 'w', newline='') as f:
+            f.write("longitude,description\n36.76,A\n")
+        with self.assertRaises(ValueError):
+            list(geodetic_processor.stream_and_filter(self.test_csv_file, self.camp_location))
+
+    # --- Tests for filter_file ---
+    def _write_proximity_csv(self, n_copies=1):
+        with open(self.test_csv_file, 'w', newline='') as f:
+            f.write("latitude,longitude,description\n")
+            for i in range(n_copies):
+                f.write(f"56.7110,36.7615,Point {i}.1 (In)\n"
+                        f"50.0,30.0,Point {i}.2 (Out)\n"
+                        f"56.7120,36.7600,Point {i}.3 (In)\n")
+
+    def test_iter_chunk_bytes_splits_on_line_boundaries(self):
+        self._write_proximity_csv(n_copies=3)
+        with open(self.test_csv_file, 'rb') as f:
+            header, *lines = f.read().splitlines(keepends=True)
+
+        pieces = list(geodetic_processor._iter_chunk_bytes(self.test_csv_file, chunksize_bytes=40))
+
+        self.assertGreater(len(pieces), 1)
+        for piece in pieces:
+            self.assertTrue(piece.startswith(header))
+            self.assertTrue(piece.endswith(b'\n'))
+        self.assertEqual(b''.join(piece[len(header):] for piece in pieces), b''.join(lines))
+
+    @patch('builtins.print')
+    def test_filter_file_matches_stream_and_filter(self, mock_print):
+        self._write_proximity_csv(n_copies=4)
+        expected = pd.concat(geodetic_processor.stream_and_filter(self.test_csv_file, self.camp_location))
+
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers):
+                chunks = list(geodetic_processor.filter_file(
+                    self.test_csv_file, self.camp_location, max_workers=max_workers, chunksize_bytes=64))
+                self.assertGreater(len(chunks), 1)
+                assert_frame_equal(pd.concat(chunks), expected, check_dtype=False)
+
+    def test_filter_file_missing_columns_raises(self):
+        with open(self.test_csv_file, 'w', newline='') as f:
+            f.write("longitude,description\n36.76,A\n")
+        with self.assertRaises(ValueError):
+            list(geodetic_processor.filter_file(self.test_csv_file, self.camp_location))
+
+    def test_filter_file_header_only_yields_nothing(self):
+        with open(self.test_csv_file, 'w', newline='') as f:
+            f.write("latitude,longitude,description\n")
+        self.assertEqual(list(geodetic_processor.filter_file(self.test_csv_file, self.camp_location)), [])
 
     # --- Test for main function (Integration Style) ---
-    @patch('geodetic_processor.load_geodetic_data')
-    @patch('geodetic_processor.filter_by_proximity')
+    @patch('geodetic_processor.filter_file')
     @patch('geodetic_processor.create_map')
     @patch('pandas.DataFrame.to_csv')
     @patch('builtins.print')
-    def test_main_function_successful_flow(self, mock_print, mock_to_csv, mock_create_map, mock_filter_by_proximity, mock_load_geodetic_data):
-        mock_load_geodetic_data.return_value = self.sample_df.copy()
-        filtered_sample_df = self.sample_df.head(1).copy()
-        mock_filter_by_proximity.return_value = filtered_sample_df
+    def test_main_function_successful_flow(self, mock_print, mock_to_csv, mock_create_map, mock_filter_file):
+        filtered_chunks = [self.sample_df.head(1).copy(), self.sample_df.iloc[2:].copy()]
+        mock_filter_file.return_value = iter(filtered_chunks)
 
         geodetic_processor.main()
 
-        mock_load_geodetic_data.assert_called_once_with(DEFAULT_INPUT_CSV_FILE)
+        mock_filter_file.assert_called_once_with(DEFAULT_INPUT_CSV_FILE, self.camp_location)
+        mock_to_csv.assert_called_once()
+        self.assertEqual(mock_to_csv.call_args.kwargs, {
+            'index': False,
+            'columns': ['latitude', 'longitude', 'description'],
+            'float_format': '%.6f',
+            'lineterminator': '\n',
+        })
+        self.assertEqual(mock_to_csv.call_args[0][0].name, DEFAULT_FILTERED_CSV_FILE)
+
+        # The filtered chunks are concatenated before mapping
+        mock_create_map.assert_called_once()
+        assert_frame_equal(mock_create_map.call_args[0][0], pd.concat(filtered_chunks))
+        self.assertEqual(mock_create_map.call_args[0][1], self.camp_location)
+        self.assertEqual(mock_create_map.call_args.kwargs, {'map_file_path': DEFAULT_OUTPUT_MAP_FILE})
+
+    @patch('geodetic_processor.filter_file')
+    @patch('geodetic_processor.create_map')
+    @patch('builtins.print')
+    def test_main_function_writes_filtered_csv(self, mock_print, mock_create_map, mock_filter_file):
+        filtered = self.sample_df.head(2).assign(distance_km=[0.0556, 0.1712345678])
+        mock_filter_file.return_value = iter([filtered])
 
-        # Corrected assertion for mock_filter_by_proximity
-        self.assertEqual(mock_filter_by_proximity.call_count, 1)
-        call_args = mock_filter_by_proximity.call_args[0]
-        assert_frame_equal(call_args[0], self.sample_df) # Compare DataFrame argument
-        self.assertEqual(call_args[1], self.camp_location) # Compare non-DataFrame argument directly
+        geodetic_processor.main()
 
-        mock_to_csv.assert_called_once_with(DEFAULT_FILTERED_CSV_FILE, index=False)
-        mock_create_map.assert_called_once_with(filtered_sample_df, self.camp_location, map_file_path=DEFAULT_OUTPUT_MAP_FILE)
+        with open(DEFAULT_FILTERED_CSV_FILE, newline='') as fh:
+            lines = fh.read().split('\n')
+        self.assertEqual(lines[0], 'latitude,longitude,description,distance_km')
+        self.assertEqual(lines[1], '56.711000,36.761500,Point A (Near Camp),0.055600')
+        self.assertEqual(lines[2], '56.713000,36.760000,Point B (Near Camp),0.171235')
+        self.assertEqual(lines[3], '')
 
-    @patch('geodetic_processor.load_geodetic_data', return_value=None)
-    @patch('geodetic_processor.filter_by_proximity')
+    @patch('geodetic_processor.filter_file', side_effect=ValueError("The file must contain 'latitude' and 'longitude' columns."))
     @patch('geodetic_processor.create_map')
     @patch('builtins.print')
-    def test_main_function_handles_load_failure(self, mock_print, mock_create_map, mock_filter_by_proximity, mock_load_failure):
+    def test_main_function_handles_load_failure(self, mock_print, mock_create_map, mock_load_failure):
         geodetic_processor.main()
 
-        mock_load_failure.assert_called_once_with(DEFAULT_INPUT_CSV_FILE)
-        mock_filter_by_proximity.assert_not_called()
+        mock_load_failure.assert_called_once_with(DEFAULT_INPUT_CSV_FILE, self.camp_location)
         mock_print.assert_any_call("Failed to load geodetic data. Cannot proceed with filtering and mapping. Exiting.")
 
         mock_create_map.assert_called_once()
@@ -312,6 +655,17 @@ class TestGeodeticProcessor(unittest.TestCase):
         # Check second argument is camp_location
         self.assertEqual(mock_create_map.call_args[0][1], self.camp_location)
 
+    @patch('geodetic_processor.filter_file', return_value=iter([]))
+    @patch('geodetic_processor.create_map')
+    @patch('pandas.DataFrame.to_csv')
+    @patch('builtins.print')
+    def test_main_function_handles_empty_file(self, mock_print, mock_to_csv, mock_create_map, mock_filter_file):
+        geodetic_processor.main()
+
+        mock_print.assert_any_call("Geodetic data file was loaded but is empty. No points to filter.")
+        mock_to_csv.assert_not_called()
+        self.assertTrue(mock_create_map.call_args[0][0].empty)
+
 
 if __name__ == '__main__':
     unittest.main(argv=['first-arg-is-ignored'], exit=False)